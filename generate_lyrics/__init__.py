@@ -1,4 +1,9 @@
-from generate_lyrics.from_video import generate_lyrics_from_video
-from generate_lyrics.from_phrases import generate_lyrics_from_phrases
+from generate_lyrics.from_video import generate_lyrics_from_video, stream_lyrics_from_video
+from generate_lyrics.from_phrases import generate_lyrics_from_phrases, stream_lyrics_from_phrases
 
-__all__ = ["generate_lyrics_from_video", "generate_lyrics_from_phrases"]
+__all__ = [
+    "generate_lyrics_from_video",
+    "generate_lyrics_from_phrases",
+    "stream_lyrics_from_video",
+    "stream_lyrics_from_phrases",
+]
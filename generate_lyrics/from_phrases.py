@@ -1,30 +1,52 @@
+from typing import Iterator
+
 import openai
+from generate_lyrics.prompts import record_cached_tokens, render_prompt
+from generate_lyrics.streaming import stream_lyrics_completion
+from generate_lyrics.validation import check_phrase_lyrics
 from models import Lyrics
+from util.model_cascade import run_cascade, stream_cascade
 
 client = openai.OpenAI()
 
-PROMPT = """You are a music composition assistant. Create a detailed composition plan for a {genre} song to learn the phrases or words provided.
-
-Tips
-- Do not put any symbols in the lyrics.
-- The lyrics must make sense and be clear instead of just repeating key words. Do not make the lyrics too catchy that it doesn't make sense.
-- The lyrics should be in hiragana and katakana unless the kanji is very easy and obvious how to read it.
-- DO NOT make the lyrics too poetic or use too difficult words, focus on clarity and ease of learning.
 
-"""
+def generate_lyrics_from_phrases(phrases: list[str], genre: str) -> Lyrics:
+    """Generate lyrics from a list of phrases/words to learn, trying the cheapest model first."""
+    prompt = render_prompt("from_phrases", genre=genre, phrases=phrases)
 
+    def call(model: str) -> Lyrics | None:
+        completion = client.chat.completions.parse(
+            model=model,
+            messages=[
+                {"role": "user", "content": prompt},
+            ],
+            response_format=Lyrics,
+            reasoning_effort="low",
+        )
+        record_cached_tokens("generate_lyrics_from_phrases", completion)
+        return completion.choices[0].message.parsed
 
-def generate_lyrics_from_phrases(phrases: list[str], genre: str) -> Lyrics:
-    """Generate lyrics from a list of phrases/words to learn."""
-    completion = client.chat.completions.parse(
-        model="gpt-5.2",
-        messages=[
-            {"role": "user", "content": PROMPT.format(genre=genre) + "\n\nPhrases: " + "\n".join(phrases)},
-        ],
-        response_format=Lyrics,
-        reasoning_effort="low",
-    )
-
-    lyrics = completion.choices[0].message.parsed
+    lyrics = run_cascade("generate_lyrics_from_phrases", call, check_phrase_lyrics)
     print(lyrics)
     return lyrics
+
+
+def stream_lyrics_from_phrases(phrases: list[str], genre: str) -> Iterator[Lyrics]:
+    """Streaming variant of generate_lyrics_from_phrases.
+
+    Yields partial Lyrics as tokens arrive; the last value yielded is the final validated Lyrics.
+    """
+    prompt = render_prompt("from_phrases", genre=genre, phrases=phrases)
+
+    def stream_call(model: str):
+        return stream_lyrics_completion(
+            client,
+            "generate_lyrics_from_phrases",
+            model=model,
+            messages=[
+                {"role": "user", "content": prompt},
+            ],
+            reasoning_effort="low",
+        )
+
+    yield from stream_cascade("generate_lyrics_from_phrases", stream_call, check_phrase_lyrics)
@@ -1,56 +1,101 @@
 import os
 import subprocess
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator
 
 import openai
+from generate_lyrics.prompts import record_cached_tokens, render_prompt
+from generate_lyrics.streaming import stream_lyrics_completion
 from models import Lyrics
+from util.stream_ingest import iter_audio_segments
 
 client = openai.OpenAI()
 
-PROMPT = """You are a music composition assistant. Create a detailed composition plan for a {genre} song to learn the important topic covered in the transcript. The lyrics should be catchy with some repeats. It must be Japanese. Break the song into logical sections with appropriate styles, durations, and lyrics.
+TRANSCRIBE_WORKERS = 4
 
-Tips on lyrics:
-- Do not include useless lyrics like "みっつの点を おぼえよう"
-- Do not repeat the same information in multiple sections.
 
+def _transcribe_file(audio_path: str | Path) -> str:
+    with open(audio_path, "rb") as audio_file:
+        transcription = client.audio.transcriptions.create(
+            model="gpt-4o-transcribe",
+            file=audio_file,
+        )
+    return transcription.text
 
-Tips
-- The whole song should be under 12 lines.
-- Do not put any symbols in the lyrics.
-- The lyrics must make sense and be clear instead of just repeating key words. Do not make the lyrics too catchy that it doesn't make sense.
-- The lyrics should be in hiragana and katakana unless the kanji is very easy and obvious how to read it.
-- DO NOT make the lyrics too poetic or use too difficult words, focus on clarity and ease of learning.
-"""
 
+def _transcribe_streamed(video_url: str) -> str:
+    """Transcribe audio segments in parallel while yt-dlp is still downloading later ones."""
+    with tempfile.TemporaryDirectory() as temp_dir, ThreadPoolExecutor(TRANSCRIBE_WORKERS) as pool:
+        futures = [
+            pool.submit(_transcribe_file, segment)
+            for segment in iter_audio_segments(video_url, Path(temp_dir))
+        ]
+        return " ".join(text for future in futures if (text := future.result().strip()))
 
-def generate_lyrics_from_video(video_url: str, genre: str) -> Lyrics:
-    """Download a YouTube video, transcribe it, and generate lyrics."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        audio_path = os.path.join(temp_dir, "audio.mp3")
 
-        subprocess.run(
-            ["yt-dlp", "-x", "--audio-format", "mp3", "-o", audio_path, video_url],
-            check=True,
-        )
+def transcribe_video(video_url: str, streamed_ingest: bool = True) -> str:
+    """Download a YouTube video's audio and transcribe it.
 
-        with open(audio_path, "rb") as audio_file:
-            transcription = client.audio.transcriptions.create(
-                model="gpt-4o-transcribe",
-                file=audio_file,
+    With streamed_ingest=True, the smallest audio-only format is piped into fixed-length segments
+    that are transcribed as they arrive. Otherwise the whole video is downloaded and
+    converted to MP3 before a single transcription request.
+    """
+    start = time.time()
+    if streamed_ingest:
+        transcript_text = _transcribe_streamed(video_url)
+    else:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            audio_path = os.path.join(temp_dir, "audio.mp3")
+
+            subprocess.run(
+                ["yt-dlp", "-x", "--audio-format", "mp3", "-o", audio_path, video_url],
+                check=True,
             )
+            transcript_text = _transcribe_file(audio_path)
 
-        transcript_text = transcription.text
-        print(f"Transcription: {transcript_text}")
+    print(f"Transcription ({time.time() - start:.1f}s): {transcript_text}")
+    return transcript_text
 
-        completion = client.chat.completions.parse(
-            model="gpt-5.2",
-            messages=[
-                {"role": "user", "content": PROMPT.format(genre=genre) + "\n\nTranscript: " + transcript_text},
-            ],
-            response_format=Lyrics,
-            reasoning_effort="low",
-        )
 
-        lyrics = completion.choices[0].message.parsed
-        print(lyrics)
-        return lyrics
+def generate_lyrics_from_video(video_url: str, genre: str, streamed_ingest: bool = True) -> Lyrics:
+    """Download a YouTube video, transcribe it, and generate lyrics."""
+    transcript_text = transcribe_video(video_url, streamed_ingest=streamed_ingest)
+
+    completion = client.chat.completions.parse(
+        model="gpt-5.2",
+        messages=[
+            {"role": "user", "content": render_prompt("from_video", genre=genre, transcript=transcript_text)},
+        ],
+        response_format=Lyrics,
+        reasoning_effort="low",
+    )
+    record_cached_tokens("generate_lyrics_from_video", completion)
+
+    lyrics = completion.choices[0].message.parsed
+    print(lyrics)
+    return lyrics
+
+
+def stream_lyrics_from_video(video_url: str, genre: str, streamed_ingest: bool = True) -> Iterator[Lyrics]:
+    """Streaming variant of generate_lyrics_from_video.
+
+    Yields partial Lyrics as tokens arrive; the last value yielded is the final validated Lyrics.
+    """
+    transcript_text = transcribe_video(video_url, streamed_ingest=streamed_ingest)
+
+    lyrics = yield from stream_lyrics_completion(
+        client,
+        "generate_lyrics_from_video",
+        model="gpt-5.2",
+        messages=[
+            {"role": "user", "content": render_prompt("from_video", genre=genre, transcript=transcript_text)},
+        ],
+        reasoning_effort="low",
+    )
+    if lyrics is None:
+        raise RuntimeError("Lyrics generation returned no parsed lyrics.")
+    print(lyrics)
+    yield lyrics
@@ -1,8 +1,131 @@
+from collections import Counter, defaultdict
+
 import jinja2
 
+# Prompts are laid out so that everything before the first variable is byte-identical
+# across calls: long static instructions first, then genre/phrases/transcript last.
+# This lets the provider reuse the cached prompt prefix between requests.
+
 general_tips = """
 - Do not put any symbols in the lyrics.
 - The lyrics must make sense and be clear instead of just repeating key words. Do not make the lyrics too catchy that it doesn't make sense.
 - The lyrics should be in hiragana and katakana unless the kanji is very easy and obvious how to read it.
 - DO NOT make the lyrics too poetic or use too difficult words, focus on clarity and ease of learning.
-"""
\ No newline at end of file
+"""
+
+FROM_PHRASES = """You are a music composition assistant. Create a detailed composition plan for a song in the genre given below to learn the phrases or words provided.
+
+Tips
+{{ general_tips }}
+
+Genre: {{ genre }}
+
+Phrases: {{ phrases | join("\\n") }}"""
+
+FROM_VIDEO = """You are a music composition assistant. Create a detailed composition plan for a song in the genre given below to learn the important topic covered in the transcript. The lyrics should be catchy with some repeats. It must be Japanese. Break the song into logical sections with appropriate styles, durations, and lyrics.
+
+Tips on lyrics:
+- Do not include useless lyrics like "みっつの点を おぼえよう"
+- Do not repeat the same information in multiple sections.
+
+
+Tips
+- The whole song should be under 12 lines.
+{{ general_tips }}
+
+Genre: {{ genre }}
+
+Transcript: {{ transcript }}"""
+
+MIXED_LANGUAGE = """You are a music lyrics composer. Write a lyrics for a song to learn the phrases or words provided for a Japanese student learning English.
+
+Tips
+- Do not put any symbols (eg. ", ", ".", "!", "?", etc.) in the lyrics except for the song queue and () for the words (see the example lyrics)
+- The lyrics must make sense and be clear instead of just repeating key words. Do not make the lyrics too catchy that it doesn't make sense.
+- The lyrics should be in hiragana and katakana unless the kanji is very easy and obvious how to read it.
+- DO NOT make the lyrics too poetic or use too difficult words, focus on clarity and ease of learning.
+- **The lyrics should make clear who the word should be used**
+- The order doesn't really matter, try to come up with a good lyrics that flows well line to line.
+- Each line should feature a single word (a Japanese sentence containing a English word). Do not use more than one word per line. or use more than one word per line.
+- Every line should feature a single word
+- Make sure each line is not too long.
+
+Structure:
+[Verse 1]
+
+[Chorus 1]
+
+[Verse 2]
+
+[Chorus 2]
+
+The lyrics should have these sections. Verse 1 2 and Chorus 1 2 must have the same structure. The number of lines should match, and ideally the structure and syllables should match as well.
+
+Output fields:
+lyrics: This will be the lyrics (similar to the example lyrics below) using kanji normally.
+lyrics_for_ai:  This will be a lines of the lyrics. It's the same lyrics as lyrics but all of Kanji must be replaced with Hiragana and Katankana.
+For both fields song queue should be included ([Verse 1] [Chorus 1] [Verse 2] [Chorus 2])
+
+
+
+Example lyrics:
+[Verse 1]
+私は little 女の子 (little)
+でも large な 夢を 持ってる (large)
+
+every day 学校に 行く (every day)
+友達の 声を hear する (friend)
+
+先生が プリントを hand する (teacher)
+私の number は 3番 (number)
+
+休みの during は 本を 読む (during)
+家で study する (study)
+
+[Chorus 1]
+continues
+
+
+Phrases: {{ phrases | join("\\n") }}"""
+
+_env = jinja2.Environment(
+    loader=jinja2.DictLoader(
+        {
+            "from_phrases": FROM_PHRASES,
+            "from_video": FROM_VIDEO,
+            "mixed_language": MIXED_LANGUAGE,
+        }
+    ),
+    undefined=jinja2.StrictUndefined,
+    autoescape=False,
+)
+_env.globals["general_tips"] = general_tips.strip("\n")
+
+# Compiled once at import time and shared by every generator.
+TEMPLATES = {name: _env.get_template(name) for name in _env.list_templates()}
+
+cache_stats: dict[str, Counter] = defaultdict(Counter)
+
+
+def render_prompt(name: str, **variables) -> str:
+    """Render a registered prompt template, e.g. render_prompt("from_phrases", genre=..., phrases=[...])."""
+    return TEMPLATES[name].render(**variables)
+
+
+def record_cached_tokens(name: str, completion) -> int:
+    """Record prompt and cached token counts from a completion's usage; returns the cached tokens."""
+    usage = completion.usage
+    if usage is None:
+        return 0
+    details = usage.prompt_tokens_details
+    cached_tokens = (details.cached_tokens or 0) if details else 0
+
+    stats = cache_stats[name]
+    stats["requests"] += 1
+    stats["prompt_tokens"] += usage.prompt_tokens
+    stats["cached_tokens"] += cached_tokens
+    print(
+        f"[{name}] cached {cached_tokens}/{usage.prompt_tokens} prompt tokens "
+        f"({stats['cached_tokens'] / max(stats['prompt_tokens'], 1):.0%} over {stats['requests']} requests)"
+    )
+    return cached_tokens
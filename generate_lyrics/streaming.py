@@ -0,0 +1,35 @@
+from typing import Generator
+
+import openai
+
+from generate_lyrics.prompts import record_cached_tokens
+from models import Lyrics
+
+
+def partial_lyrics(parsed: dict) -> Lyrics:
+    """Build an unvalidated Lyrics from a partially parsed JSON snapshot."""
+    return Lyrics.model_construct(
+        lyrics=parsed.get("lyrics") or "",
+        lyrics_for_ai=parsed.get("lyrics_for_ai") or "",
+    )
+
+
+def stream_lyrics_completion(
+    client: openai.OpenAI, name: str, **kwargs
+) -> Generator[Lyrics, None, Lyrics | None]:
+    """Stream a structured Lyrics completion, yielding partial Lyrics as tokens arrive.
+
+    Returns the final parsed Lyrics, which the SDK validates against the model.
+    """
+    with client.chat.completions.stream(
+        response_format=Lyrics,
+        stream_options={"include_usage": True},
+        **kwargs,
+    ) as stream:
+        for event in stream:
+            if event.type == "content.delta" and isinstance(event.parsed, dict):
+                yield partial_lyrics(event.parsed)
+        completion = stream.get_final_completion()
+
+    record_cached_tokens(name, completion)
+    return completion.choices[0].message.parsed
@@ -0,0 +1,95 @@
+import unicodedata
+
+from models import SECTION_PATTERN, Lyrics
+
+MIXED_LANGUAGE_SECTIONS = ["Verse 1", "Chorus 1", "Verse 2", "Chorus 2"]
+
+
+def find_symbols(text: str, allowed: str = "") -> set[str]:
+    """Return punctuation/symbol characters in text that are not in `allowed`.
+
+    The long vowel mark "ー" is a letter in Unicode, so it is never reported.
+    """
+    return {
+        char
+        for char in text
+        if char not in allowed and unicodedata.category(char)[0] in ("P", "S")
+    }
+
+
+def has_kanji(text: str) -> bool:
+    return any("一" <= char <= "鿿" or "㐀" <= char <= "䶿" for char in text)
+
+
+def split_sections(text: str) -> dict[str, list[str]]:
+    """Split lyrics into {section name: non-empty lines} using the [Section] cue lines."""
+    sections: dict[str, list[str]] = {}
+    current = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = SECTION_PATTERN.match(line)
+        if match:
+            current = match.group(1).strip()
+            sections[current] = []
+        elif current is not None:
+            sections[current].append(line)
+    return sections
+
+
+def check_lyrics(lyrics: Lyrics | None) -> list[str]:
+    """Checks shared by every generator: the output parsed and both fields are filled in."""
+    if lyrics is None:
+        return ["no parsed Lyrics in the response"]
+    problems = []
+    if not lyrics.lyrics.strip():
+        problems.append("lyrics is empty")
+    if not lyrics.lyrics_for_ai.strip():
+        problems.append("lyrics_for_ai is empty")
+    return problems
+
+
+def check_phrase_lyrics(lyrics: Lyrics | None) -> list[str]:
+    """Validate the format rules of the from_phrases prompt; [Section] cue lines are not lyrics."""
+    problems = check_lyrics(lyrics)
+    if problems:
+        return problems
+    sung_lines = [line for line in lyrics.lyrics.splitlines() if not SECTION_PATTERN.match(line.strip())]
+    symbols = find_symbols("\n".join(sung_lines))
+    if symbols:
+        problems.append(f"lyrics contain symbols: {''.join(sorted(symbols))}")
+    return problems
+
+
+def check_mixed_language_lyrics(lyrics: Lyrics | None) -> list[str]:
+    """Validate the format rules of the mixed_language prompt."""
+    problems = check_lyrics(lyrics)
+    if problems:
+        return problems
+
+    for field in ("lyrics", "lyrics_for_ai"):
+        text = getattr(lyrics, field)
+        symbols = find_symbols(text, allowed="[]()")
+        if symbols:
+            problems.append(f"{field} contains symbols: {''.join(sorted(symbols))}")
+
+        sections = split_sections(text)
+        missing = [name for name in MIXED_LANGUAGE_SECTIONS if name not in sections]
+        if missing:
+            problems.append(f"{field} is missing sections: {', '.join(missing)}")
+            continue
+        for first, second in (("Verse 1", "Verse 2"), ("Chorus 1", "Chorus 2")):
+            if len(sections[first]) != len(sections[second]):
+                problems.append(
+                    f"{field}: {first} has {len(sections[first])} lines but {second} has {len(sections[second])}"
+                )
+
+    for line in lyrics.lyrics.splitlines():
+        line = line.strip()
+        if line and not SECTION_PATTERN.match(line) and line.count("(") != 1:
+            problems.append(f"line does not feature exactly one word: {line}")
+
+    if has_kanji(lyrics.lyrics_for_ai):
+        problems.append("lyrics_for_ai contains kanji")
+    return problems
@@ -1,11 +1,18 @@
+import os
 import pathlib
+import shutil
+import time
 
 from generate_lyrics.from_phrases import generate_lyrics_from_phrases
 from generate_lyrics.from_video import generate_lyrics_from_video
 from generate_lyrics.mixed_language import generate_mixed_language_lyrics
 from models import Lyrics
+from util.artifacts import build_lyric_lines, save_manifest, write_artifacts
+from util.catalog import catalog_path_for, file_sha256, find_existing, record_song
 from util.get_time_stamp import align_lyrics, extract_timestamps
 from util.kie_api import generate_music_kie
+from util.lyric_video import render_lyric_video
+from util.refine_timestamps import refine_line_boundaries
 
 
 def compose_music(lyrics: Lyrics, genre: str, output_dir: pathlib.Path) -> None:
@@ -27,7 +34,7 @@ def generate_timestamps(lyrics: Lyrics, output_dir: pathlib.Path) -> str:
     """Extract timestamps from generated music and align with lyrics."""
     music_path = output_dir / "music.mp3"
     timestamped_words = extract_timestamps(music_path)
-    aligned_lyrics = align_lyrics("\n".join(lyrics.lyrics_for_ai), timestamped_words)
+    aligned_lyrics = align_lyrics(lyrics.lyrics_for_ai, timestamped_words)
     return aligned_lyrics
 
 
@@ -42,36 +49,203 @@ lyrics: {lyrics.lyrics}
     print(f"Info saved to: {output_dir / 'info.txt'}")
 
 
-def run_pipeline(lyrics: Lyrics, genre: str, output_dir: pathlib.Path) -> None:
-    """Run the full pipeline: compose music, extract timestamps, save info."""
+def run_pipeline(
+    lyrics: Lyrics,
+    genre: str,
+    output_dir: pathlib.Path,
+    source: str = "lyrics",
+    phrases: list[str] | None = None,
+    video_url: str | None = None,
+    timings: dict[str, float] | None = None,
+    render_video: bool = True,
+    catalog_path: pathlib.Path | None = None,
+) -> None:
+    """Run the full pipeline: compose music, extract and refine timestamps, save info and
+    artifacts, render the lyric video, and catalog the song.
+
+    catalog_path defaults to the catalog next to output_dir; pass the resources root's
+    catalog explicitly when output_dir is nested deeper than one level.
+    """
+    timings = dict(timings or {})
+
+    start = time.time()
     compose_music(lyrics, genre, output_dir)
+    timings["compose_music"] = time.time() - start
+
+    start = time.time()
     aligned_lyrics = generate_timestamps(lyrics, output_dir)
+    timings["generate_timestamps"] = time.time() - start
+
     save_info(lyrics, aligned_lyrics, output_dir)
 
+    start = time.time()
+    lines = refine_line_boundaries(build_lyric_lines(aligned_lyrics), output_dir / "music.mp3")
+    timings["refine_timestamps"] = time.time() - start
+
+    manifest = write_artifacts(lyrics, genre, lines, output_dir)
+
+    if render_video:
+        start = time.time()
+        video_path = render_lyric_video(manifest, output_dir)
+        if video_path:
+            timings["render_video"] = time.time() - start
+            manifest.artifacts["video"] = video_path.name
+            save_manifest(manifest, output_dir)
+
+    record_song(
+        catalog_path or catalog_path_for(output_dir),
+        output_dir,
+        source=source,
+        genre=genre,
+        lyrics=lyrics,
+        phrases=phrases,
+        video_url=video_url,
+        duration_seconds=manifest.duration_seconds,
+        timings=timings,
+        artifacts={**manifest.artifacts, "manifest": "manifest.json"},
+    )
+
+
+def _link_artifacts(source_dir: pathlib.Path, output_dir: pathlib.Path) -> None:
+    """Hard-link (or copy, across filesystems) every file of a finished song into output_dir.
+
+    Raises FileExistsError, before linking anything, if output_dir already holds a file of
+    the same name with different contents, i.e. a different song.
+    """
+    files = [path for path in source_dir.iterdir() if path.is_file()]
+    conflicts = [
+        path.name
+        for path in files
+        if (output_dir / path.name).exists() and file_sha256(output_dir / path.name) != file_sha256(path)
+    ]
+    if conflicts:
+        raise FileExistsError(
+            f"{output_dir} already holds a different song ({', '.join(sorted(conflicts))}); "
+            "choose an empty folder or disable reuse"
+        )
 
-def from_video(video_url: str, genre: str, output_dir: pathlib.Path) -> Lyrics:
-    """Convenience: generate lyrics from video and run the full pipeline."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for path in files:
+        target = output_dir / path.name
+        if target.exists():
+            continue
+        try:
+            os.link(path, target)
+        except OSError:
+            shutil.copy2(path, target)
+
+
+def reuse_existing(
+    output_dir: pathlib.Path,
+    source: str,
+    genre: str,
+    catalog_path: pathlib.Path | None = None,
+    **request,
+) -> Lyrics | None:
+    """If a catalogued song already covers this request, put its artifacts in output_dir and return its lyrics."""
+    song = find_existing(catalog_path or catalog_path_for(output_dir), source, genre, **request)
+    if song is None:
+        return None
+    if song.output_dir != pathlib.Path(output_dir).resolve():
+        _link_artifacts(song.output_dir, pathlib.Path(output_dir))
+    print(f"Reusing existing song from {song.output_dir} (catalog id {song.id}) in {output_dir}")
+    return song.lyrics
+
+
+def from_video(
+    video_url: str,
+    genre: str,
+    output_dir: pathlib.Path,
+    reuse: bool = True,
+    catalog_path: pathlib.Path | None = None,
+) -> Lyrics:
+    """Convenience: generate lyrics from video and run the full pipeline.
+
+    With reuse=True, a catalogued song for the same video and genre is linked into output_dir instead.
+    """
+    existing = reuse and reuse_existing(output_dir, "video", genre, catalog_path=catalog_path, video_url=video_url)
+    if existing:
+        return existing
+    start = time.time()
     lyrics = generate_lyrics_from_video(video_url, genre)
-    run_pipeline(lyrics, genre, output_dir)
+    timings = {"generate_lyrics": time.time() - start}
+    run_pipeline(
+        lyrics, genre, output_dir, source="video", video_url=video_url, timings=timings, catalog_path=catalog_path
+    )
     return lyrics
 
 
-def from_phrases(phrases: list[str], genre: str, output_dir: pathlib.Path) -> Lyrics:
-    """Convenience: generate lyrics from phrases and run the full pipeline."""
+def from_phrases(
+    phrases: list[str],
+    genre: str,
+    output_dir: pathlib.Path,
+    reuse: bool = True,
+    catalog_path: pathlib.Path | None = None,
+) -> Lyrics:
+    """Convenience: generate lyrics from phrases and run the full pipeline.
+
+    With reuse=True, a catalogued song covering the same or a superset of the phrases is linked
+    into output_dir instead.
+    """
+    existing = reuse and reuse_existing(output_dir, "phrases", genre, catalog_path=catalog_path, phrases=phrases)
+    if existing:
+        return existing
+    start = time.time()
     lyrics = generate_lyrics_from_phrases(phrases, genre)
-    run_pipeline(lyrics, genre, output_dir)
+    timings = {"generate_lyrics": time.time() - start}
+    run_pipeline(
+        lyrics, genre, output_dir, source="phrases", phrases=phrases, timings=timings, catalog_path=catalog_path
+    )
     return lyrics
 
 
-def from_mixed_language(phrases: list[str], genre: str, output_dir: pathlib.Path) -> Lyrics:
-    """Convenience: generate mixed-language lyrics from phrases and run the full pipeline."""
+def from_mixed_language(
+    phrases: list[str],
+    genre: str,
+    output_dir: pathlib.Path,
+    reuse: bool = True,
+    catalog_path: pathlib.Path | None = None,
+) -> Lyrics:
+    """Convenience: generate mixed-language lyrics from phrases and run the full pipeline.
+
+    With reuse=True, a catalogued song covering the same or a superset of the phrases is linked
+    into output_dir instead.
+    """
+    existing = reuse and reuse_existing(output_dir, "mixed_language", genre, catalog_path=catalog_path, phrases=phrases)
+    if existing:
+        return existing
+    start = time.time()
     lyrics = generate_mixed_language_lyrics(phrases, genre)
-    run_pipeline(lyrics, genre, output_dir)
+    timings = {"generate_lyrics": time.time() - start}
+    run_pipeline(
+        lyrics, genre, output_dir, source="mixed_language", phrases=phrases, timings=timings, catalog_path=catalog_path
+    )
     return lyrics
 
-def from_lyrics(lyrics: Lyrics, genre: str, output_dir: pathlib.Path) -> Lyrics:
-    """Convenience: run the full pipeline with existing lyrics."""
-    run_pipeline(lyrics, genre, output_dir)
+def from_lyrics(
+    lyrics: Lyrics,
+    genre: str,
+    output_dir: pathlib.Path,
+    source: str = "lyrics",
+    phrases: list[str] | None = None,
+    video_url: str | None = None,
+    timings: dict[str, float] | None = None,
+    catalog_path: pathlib.Path | None = None,
+) -> Lyrics:
+    """Convenience: run the full pipeline with existing lyrics.
+
+    source, phrases and video_url describe where the lyrics came from, for the catalog.
+    """
+    run_pipeline(
+        lyrics,
+        genre,
+        output_dir,
+        source=source,
+        phrases=phrases,
+        video_url=video_url,
+        timings=timings,
+        catalog_path=catalog_path,
+    )
     return lyrics
 
 
@@ -1,7 +1,28 @@
+import re
+
 import pydantic
 
+# A [Section] cue line such as "[Chorus 1]"; group 1 is the section name.
+SECTION_PATTERN = re.compile(r"^\[(.+)\]$")
+
 
 class Lyrics(pydantic.BaseModel):
     lyrics: str
     lyrics_for_ai: str
-    
\ No newline at end of file
+
+
+class LyricLine(pydantic.BaseModel):
+    text: str
+    start: float
+    end: float
+    section: str | None = None
+
+
+class SongManifest(pydantic.BaseModel):
+    version: int = 1
+    genre: str
+    lyrics: str
+    lyrics_for_ai: str
+    duration_seconds: float | None = None
+    lines: list[LyricLine]
+    artifacts: dict[str, str]
@@ -1,15 +1,18 @@
 import contextlib
 import io
 import os
+import time
+from datetime import datetime
 from pathlib import Path
 
 import streamlit as st
 
-from generate_lyrics.from_phrases import generate_lyrics_from_phrases
-from generate_lyrics.from_video import generate_lyrics_from_video
-from generate_lyrics.mixed_language import generate_mixed_language_lyrics
-from generate_music import from_lyrics, from_mixed_language, from_phrases, from_video
+from generate_lyrics.from_phrases import stream_lyrics_from_phrases
+from generate_lyrics.from_video import stream_lyrics_from_video
+from generate_lyrics.mixed_language import stream_mixed_language_lyrics
+from generate_music import from_lyrics, reuse_existing
 from models import Lyrics
+from util.catalog import CATALOG_FILENAME, search_songs
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_RESOURCES_DIR = PROJECT_ROOT / "resources"
@@ -17,6 +20,12 @@ MODE_VIDEO = "From Video URL"
 MODE_PHRASES = "From Phrases"
 MODE_MIXED = "From Phrases (Mixed Language)"
 MODE_MANUAL = "From Existing Lyrics"
+MODE_SOURCES = {
+    MODE_VIDEO: "video",
+    MODE_PHRASES: "phrases",
+    MODE_MIXED: "mixed_language",
+    MODE_MANUAL: "lyrics",
+}
 
 
 def _to_abs_path(path_str: str) -> Path:
@@ -64,51 +73,63 @@ def _run_with_captured_logs(fn, *args, **kwargs):
             return None, logs.getvalue(), exc
 
 
-def _generate(
+def _stream_to_final(stream, on_partial) -> Lyrics:
+    lyrics = None
+    for lyrics in stream:
+        on_partial(lyrics)
+    if lyrics is None:
+        raise RuntimeError("Lyrics generation returned no lyrics.")
+    return lyrics
+
+
+def _generate_lyrics(
     mode: str,
     genre: str,
-    run_full_pipeline: bool,
-    output_dir: Path,
     video_url: str,
     phrases_text: str,
     lyrics_text: str,
     lyrics_for_ai_text: str,
+    on_partial,
 ) -> Lyrics:
     if mode == MODE_VIDEO:
         if not video_url.strip():
             raise ValueError("Video URL is required for video mode.")
-        if run_full_pipeline:
-            return from_video(video_url.strip(), genre, output_dir)
-        return generate_lyrics_from_video(video_url.strip(), genre)
-
-    if mode == MODE_PHRASES:
+        lyrics_obj = _stream_to_final(stream_lyrics_from_video(video_url.strip(), genre), on_partial)
+    elif mode == MODE_PHRASES:
         phrases = _parse_phrases(phrases_text)
         if not phrases:
             raise ValueError("Please provide at least one phrase.")
-        if run_full_pipeline:
-            return from_phrases(phrases, genre, output_dir)
-        return generate_lyrics_from_phrases(phrases, genre)
-
-    if mode == MODE_MIXED:
+        lyrics_obj = _stream_to_final(stream_lyrics_from_phrases(phrases, genre), on_partial)
+    elif mode == MODE_MIXED:
         phrases = _parse_phrases(phrases_text)
         if not phrases:
             raise ValueError("Please provide at least one phrase.")
-        if run_full_pipeline:
-            return from_mixed_language(phrases, genre, output_dir)
-        return generate_mixed_language_lyrics(phrases, genre)
-
-    if mode == MODE_MANUAL:
+        lyrics_obj = _stream_to_final(stream_mixed_language_lyrics(phrases, genre), on_partial)
+    elif mode == MODE_MANUAL:
         if not lyrics_text.strip():
             raise ValueError("Lyrics text is required for manual mode.")
         lyrics_obj = Lyrics(
             lyrics=lyrics_text.strip(),
             lyrics_for_ai=(lyrics_for_ai_text.strip() or lyrics_text.strip()),
         )
-        if run_full_pipeline:
-            return from_lyrics(lyrics_obj, genre, output_dir)
-        return lyrics_obj
+    else:
+        raise ValueError(f"Unsupported mode: {mode}")
+    return lyrics_obj
+
 
-    raise ValueError(f"Unsupported mode: {mode}")
+def _reuse_song(
+    mode: str, genre: str, output_dir: Path, catalog_path: Path, video_url: str, phrases_text: str
+) -> Lyrics | None:
+    """Link a catalogued song covering this request into output_dir, like the scripted from_* helpers."""
+    if mode == MODE_VIDEO and video_url.strip():
+        return reuse_existing(
+            output_dir, MODE_SOURCES[mode], genre, catalog_path=catalog_path, video_url=video_url.strip()
+        )
+    if mode in (MODE_PHRASES, MODE_MIXED):
+        return reuse_existing(
+            output_dir, MODE_SOURCES[mode], genre, catalog_path=catalog_path, phrases=_parse_phrases(phrases_text)
+        )
+    return None
 
 
 st.set_page_config(page_title="Outline Generation UI", layout="wide")
@@ -126,6 +147,9 @@ if "last_mode" not in st.session_state:
     st.session_state.last_mode = ""
 if "last_full_pipeline" not in st.session_state:
     st.session_state.last_full_pipeline = False
+# from_lyrics arguments for lyrics that have been generated but not composed yet.
+if "pending_song" not in st.session_state:
+    st.session_state.pending_song = None
 
 with st.form("outline_generation_form"):
     mode = st.radio(
@@ -138,8 +162,8 @@ with st.form("outline_generation_form"):
         height=120,
         placeholder="Example: Addictive Japanese female vocaloid, short intro/outro, clear English pronunciation...",
     )
-    run_full_pipeline = st.checkbox(
-        "Run full pipeline (generate music.mp3 + alignment + info.txt)",
+    reuse_song = st.checkbox(
+        "Reuse an existing song from the catalog when one already covers this request",
         value=True,
     )
 
@@ -169,7 +193,7 @@ with st.form("outline_generation_form"):
     submitted = st.form_submit_button("Generate")
 
 if submitted:
-    missing_env = _check_required_env(run_full_pipeline)
+    missing_env = _check_required_env(run_full_pipeline=False)
     if missing_env:
         st.error(f"Missing required environment variables: {', '.join(missing_env)}")
     elif not genre.strip():
@@ -178,31 +202,65 @@ if submitted:
         try:
             resources_base = _to_abs_path(resources_base_input)
             output_dir = _resolve_output_dir(resources_base, topic_name)
-            if run_full_pipeline:
-                output_dir.mkdir(parents=True, exist_ok=True)
-
-            with st.spinner("Generating... this can take several minutes for full pipeline runs."):
-                lyrics_obj, logs, generation_error = _run_with_captured_logs(
-                    _generate,
-                    mode,
-                    genre.strip(),
-                    run_full_pipeline,
-                    output_dir,
-                    video_url,
-                    phrases_text,
-                    lyrics_text,
-                    lyrics_for_ai_text,
+            # Nested topics (e.g. lessons/day1) still share the catalog at the resources root.
+            catalog_path = resources_base / CATALOG_FILENAME
+            reused_lyrics = None
+            if reuse_song:
+                reused_lyrics, logs, reuse_error = _run_with_captured_logs(
+                    _reuse_song, mode, genre.strip(), output_dir, catalog_path, video_url, phrases_text
                 )
-
-            st.session_state.last_logs = logs
-            if generation_error:
-                raise generation_error
-
-            st.session_state.last_lyrics = lyrics_obj
-            st.session_state.last_output_dir = str(output_dir)
-            st.session_state.last_mode = mode
-            st.session_state.last_full_pipeline = run_full_pipeline
-            st.success("Generation completed.")
+                st.session_state.last_logs = logs
+                if reuse_error:
+                    raise reuse_error
+            if reused_lyrics:
+                st.session_state.last_lyrics = reused_lyrics
+                st.session_state.last_output_dir = str(output_dir)
+                st.session_state.last_mode = mode
+                st.session_state.last_full_pipeline = True
+                st.session_state.pending_song = None
+                st.info(f"Reused an existing catalogued song in `{output_dir}`; nothing was generated.")
+            else:
+                st.caption("Lyrics appear as they are generated. Press Stop (top right) to abort a bad generation.")
+                live_lyrics = st.empty()
+                live_lyrics_for_ai = st.empty()
+
+                def _render_partial(partial: Lyrics) -> None:
+                    live_lyrics.text(partial.lyrics)
+                    live_lyrics_for_ai.text(partial.lyrics_for_ai)
+
+                start = time.time()
+                with st.spinner("Generating lyrics..."):
+                    lyrics_obj, logs, generation_error = _run_with_captured_logs(
+                        _generate_lyrics,
+                        mode,
+                        genre.strip(),
+                        video_url,
+                        phrases_text,
+                        lyrics_text,
+                        lyrics_for_ai_text,
+                        _render_partial,
+                    )
+                live_lyrics.empty()
+                live_lyrics_for_ai.empty()
+
+                st.session_state.last_logs = logs
+                if generation_error:
+                    raise generation_error
+
+                st.session_state.last_lyrics = lyrics_obj
+                st.session_state.last_output_dir = str(output_dir)
+                st.session_state.last_mode = mode
+                st.session_state.last_full_pipeline = False
+                st.session_state.pending_song = {
+                    "genre": genre.strip(),
+                    "output_dir": output_dir,
+                    "source": MODE_SOURCES[mode],
+                    "phrases": _parse_phrases(phrases_text) if mode in (MODE_PHRASES, MODE_MIXED) else None,
+                    "video_url": video_url.strip() or None,
+                    "timings": {"generate_lyrics": time.time() - start},
+                    "catalog_path": catalog_path,
+                }
+                st.success("Lyrics generated. Review them below, then compose the music.")
         except Exception as exc:
             st.exception(exc)
 
@@ -211,6 +269,25 @@ if st.session_state.last_lyrics:
     st.text_area("lyrics", value=st.session_state.last_lyrics.lyrics, height=220, disabled=True)
     st.text_area("lyrics_for_ai", value=st.session_state.last_lyrics.lyrics_for_ai, height=220, disabled=True)
 
+    if st.session_state.pending_song and st.button("Compose music and lyric video"):
+        missing_env = _check_required_env(run_full_pipeline=True)
+        if missing_env:
+            st.error(f"Missing required environment variables: {', '.join(missing_env)}")
+        else:
+            pending_song = st.session_state.pending_song
+            pending_song["output_dir"].mkdir(parents=True, exist_ok=True)
+            with st.spinner("Composing... this can take several minutes."):
+                _, logs, compose_error = _run_with_captured_logs(
+                    from_lyrics, st.session_state.last_lyrics, **pending_song
+                )
+            st.session_state.last_logs = logs
+            if compose_error:
+                st.exception(compose_error)
+            else:
+                st.session_state.last_full_pipeline = True
+                st.session_state.pending_song = None
+                st.success("Music composed.")
+
     if st.session_state.last_full_pipeline:
         output_dir = Path(st.session_state.last_output_dir)
         music_path = output_dir / "music.mp3"
@@ -225,12 +302,41 @@ if st.session_state.last_lyrics:
         else:
             st.warning(f"`music.mp3` not found at `{music_path}`")
 
+        video_path = output_dir / "lyrics_video.mp4"
+        if video_path.exists():
+            st.video(str(video_path))
+            st.write(f"Lyric video: `{video_path}`")
+
         if info_path.exists():
             st.write(f"Info file: `{info_path}`")
             st.text_area("info.txt", value=info_path.read_text(), height=220, disabled=True)
         else:
             st.warning(f"`info.txt` not found at `{info_path}`")
 
+st.subheader("Song Catalog")
+catalog_path = _to_abs_path(resources_base_input) / CATALOG_FILENAME
+catalog_query = st.text_input("Search by word, lyrics, genre, video ID or folder", key="catalog_query")
+catalog_songs = search_songs(catalog_path, catalog_query, limit=50)
+if not catalog_songs:
+    st.caption(f"No catalogued songs found in `{catalog_path}`.")
+for song in catalog_songs:
+    created = datetime.fromtimestamp(song.created_at).strftime("%Y-%m-%d %H:%M")
+    with st.expander(f"{song.output_dir.name} · {song.source} · {created}"):
+        st.write(f"`{song.output_dir}`")
+        st.write(f"Genre: {song.genre}")
+        if song.phrases:
+            st.write(f"Phrases: {', '.join(song.phrases)}")
+        if song.video_id:
+            st.write(f"Video ID: `{song.video_id}`")
+        if song.music_path and song.music_path.exists():
+            st.audio(str(song.music_path))
+        video_path = song.artifacts.get("video")
+        if video_path and video_path.exists():
+            st.video(str(video_path))
+        for kind, path in song.artifacts.items():
+            st.write(f"{kind}: `{path}`")
+        st.text(song.lyrics.lyrics)
+
 if st.session_state.last_logs:
     with st.expander("Execution logs"):
         st.code(st.session_state.last_logs)
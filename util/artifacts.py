@@ -0,0 +1,143 @@
+import json
+from pathlib import Path
+
+import pydantic
+
+from models import SECTION_PATTERN, LyricLine, Lyrics, SongManifest
+from util.get_time_stamp import parse_alignment
+
+# Vertical 1080x1920 canvas so the ASS file can be burned straight into Shorts.
+ASS_HEADER = """[Script Info]
+ScriptType: v4.00+
+PlayResX: 1080
+PlayResY: 1920
+WrapStyle: 0
+ScaledBorderAndShadow: yes
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,Noto Sans CJK JP,72,&H00FFFFFF,&H0000FFFF,&H00000000,&H80000000,-1,0,0,0,100,100,0,0,1,4,2,5,60,60,0,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+
+def build_lyric_lines(aligned_lyrics: str) -> list[LyricLine]:
+    """Convert align_lyrics output into typed lines, folding [Section] cues into the line's section.
+
+    Each line's end is clamped to the next line's start, so the manifest, the subtitle
+    files and the lyric video all share the same non-overlapping timings.
+    """
+    try:
+        entries = parse_alignment(aligned_lyrics)
+    except ValueError as exc:
+        print(f"Could not parse aligned lyrics, writing no timed lines: {exc}")
+        return []
+
+    lines = []
+    section = None
+    for entry in entries:
+        try:
+            line = LyricLine.model_validate({**entry, "section": section})
+        except (pydantic.ValidationError, TypeError) as exc:
+            print(f"Skipping malformed aligned line {entry!r}: {exc}")
+            continue
+        text = line.text.strip()
+        match = SECTION_PATTERN.match(text)
+        if match:
+            section = match.group(1).strip()
+            continue
+        if text:
+            lines.append(line.model_copy(update={"text": text}))
+    return [
+        line.model_copy(update={"end": max(min(line.end, following.start), line.start)})
+        for line, following in zip(lines, lines[1:])
+    ] + lines[-1:]
+
+
+def _lrc_time(seconds: float) -> str:
+    centiseconds = round(max(seconds, 0) * 100)
+    minutes, centiseconds = divmod(centiseconds, 6000)
+    return f"{minutes:02d}:{centiseconds // 100:02d}.{centiseconds % 100:02d}"
+
+
+def _srt_time(seconds: float) -> str:
+    milliseconds = round(max(seconds, 0) * 1000)
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    return f"{hours:02d}:{minutes:02d}:{milliseconds // 1000:02d},{milliseconds % 1000:03d}"
+
+
+def ass_time(seconds: float) -> str:
+    centiseconds = round(max(seconds, 0) * 100)
+    hours, centiseconds = divmod(centiseconds, 360_000)
+    minutes, centiseconds = divmod(centiseconds, 6000)
+    return f"{hours:d}:{minutes:02d}:{centiseconds // 100:02d}.{centiseconds % 100:02d}"
+
+
+def to_lrc(lines: list[LyricLine]) -> str:
+    """Render lines as LRC, adding an empty timestamp wherever a line ends before the next starts."""
+    out = []
+    for index, line in enumerate(lines):
+        out.append(f"[{_lrc_time(line.start)}]{line.text}")
+        next_start = lines[index + 1].start if index + 1 < len(lines) else None
+        if next_start is None or line.end < next_start:
+            out.append(f"[{_lrc_time(line.end)}]")
+    return "\n".join(out) + "\n"
+
+
+def to_srt(lines: list[LyricLine]) -> str:
+    blocks = [
+        f"{index}\n{_srt_time(line.start)} --> {_srt_time(line.end)}\n{line.text}\n"
+        for index, line in enumerate(lines, start=1)
+    ]
+    return "\n".join(blocks)
+
+
+def ass_text(text: str) -> str:
+    """Escape lyric text for an ASS Dialogue line (braces would start override tags)."""
+    return text.replace("{", "(").replace("}", ")").replace("\n", "\\N")
+
+
+def to_ass(lines: list[LyricLine]) -> str:
+    events = [
+        f"Dialogue: 0,{ass_time(line.start)},{ass_time(line.end)},Default,,0,0,0,,{ass_text(line.text)}"
+        for line in lines
+    ]
+    return ASS_HEADER + "\n".join(events) + "\n"
+
+
+def write_artifacts(lyrics: Lyrics, genre: str, lines: list[LyricLine], output_dir: Path) -> SongManifest:
+    """Write manifest.json plus LRC/SRT/ASS subtitle files from the timed lyric lines."""
+    subtitles = {
+        "lrc": ("lyrics.lrc", to_lrc),
+        "srt": ("lyrics.srt", to_srt),
+        "ass": ("lyrics.ass", to_ass),
+    }
+
+    artifacts = {"music": "music.mp3", "info": "info.txt"}
+    if lines:
+        for kind, (filename, render) in subtitles.items():
+            (output_dir / filename).write_text(render(lines), encoding="utf-8")
+            artifacts[kind] = filename
+
+    manifest = SongManifest(
+        genre=genre,
+        lyrics=lyrics.lyrics,
+        lyrics_for_ai=lyrics.lyrics_for_ai,
+        duration_seconds=max(line.end for line in lines) if lines else None,
+        lines=lines,
+        artifacts=artifacts,
+    )
+    save_manifest(manifest, output_dir)
+    return manifest
+
+
+def save_manifest(manifest: SongManifest, output_dir: Path) -> None:
+    manifest_path = output_dir / "manifest.json"
+    manifest_path.write_text(
+        json.dumps(manifest.model_dump(), ensure_ascii=False, indent=2) + "\n",
+        encoding="utf-8",
+    )
+    print(f"Manifest saved to: {manifest_path} ({len(manifest.lines)} timed lines, {', '.join(manifest.artifacts)})")
@@ -0,0 +1,281 @@
+import contextlib
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from models import Lyrics
+
+# The catalog lives next to the topic folders, e.g. resources/catalog.sqlite.
+CATALOG_FILENAME = "catalog.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS songs (
+    id INTEGER PRIMARY KEY,
+    output_dir TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    genre TEXT NOT NULL,
+    video_id TEXT,
+    phrases TEXT NOT NULL,
+    lyrics TEXT NOT NULL,
+    lyrics_for_ai TEXT NOT NULL,
+    music_path TEXT,
+    music_sha256 TEXT,
+    info_path TEXT,
+    info_sha256 TEXT,
+    duration_seconds REAL,
+    timings TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS songs_lookup ON songs (source, genre);
+CREATE INDEX IF NOT EXISTS songs_video ON songs (video_id);
+CREATE INDEX IF NOT EXISTS songs_created ON songs (created_at);
+CREATE TABLE IF NOT EXISTS song_words (
+    word TEXT NOT NULL,
+    song_id INTEGER NOT NULL REFERENCES songs (id) ON DELETE CASCADE,
+    PRIMARY KEY (word, song_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS song_artifacts (
+    song_id INTEGER NOT NULL REFERENCES songs (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    PRIMARY KEY (song_id, kind)
+) WITHOUT ROWID;
+"""
+
+# Every song query selects the artifact map alongside the row as {kind: {"path", "sha256"}}.
+ARTIFACTS_SELECT = """(SELECT json_group_object(kind, json_object('path', path, 'sha256', sha256))
+    FROM song_artifacts WHERE song_artifacts.song_id = songs.id) AS artifacts"""
+
+VIDEO_ID_PATTERN = re.compile(r"(?:v=|youtu\.be/|shorts/|embed/)([A-Za-z0-9_-]{11})")
+
+
+@dataclass
+class Song:
+    id: int
+    output_dir: Path
+    source: str
+    genre: str
+    video_id: str | None
+    phrases: list[str]
+    lyrics: Lyrics
+    music_path: Path | None
+    music_sha256: str | None
+    info_path: Path | None
+    info_sha256: str | None
+    duration_seconds: float | None
+    timings: dict[str, float]
+    created_at: float
+    artifacts: dict[str, Path]
+    artifact_sha256: dict[str, str]
+
+
+def catalog_path_for(output_dir: Path) -> Path:
+    """Return the catalog shared by every topic folder under the same resources directory."""
+    return Path(output_dir).resolve().parent / CATALOG_FILENAME
+
+
+@contextlib.contextmanager
+def connect(catalog_path: Path) -> Iterator[sqlite3.Connection]:
+    """Open the catalog, creating the schema if needed; commits on success and always closes."""
+    catalog_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(catalog_path)
+    try:
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.executescript(SCHEMA)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def normalize_word(word: str) -> str:
+    return " ".join(word.lower().split())
+
+
+def video_id_from_url(video_url: str) -> str | None:
+    match = VIDEO_ID_PATTERN.search(video_url)
+    return match.group(1) if match else None
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _to_song(row: sqlite3.Row) -> Song:
+    artifacts = json.loads(row["artifacts"] or "{}")
+    return Song(
+        id=row["id"],
+        output_dir=Path(row["output_dir"]),
+        source=row["source"],
+        genre=row["genre"],
+        video_id=row["video_id"],
+        phrases=json.loads(row["phrases"]),
+        lyrics=Lyrics(lyrics=row["lyrics"], lyrics_for_ai=row["lyrics_for_ai"]),
+        music_path=Path(row["music_path"]) if row["music_path"] else None,
+        music_sha256=row["music_sha256"],
+        info_path=Path(row["info_path"]) if row["info_path"] else None,
+        info_sha256=row["info_sha256"],
+        duration_seconds=row["duration_seconds"],
+        timings=json.loads(row["timings"]),
+        created_at=row["created_at"],
+        artifacts={kind: Path(entry["path"]) for kind, entry in artifacts.items()},
+        artifact_sha256={kind: entry["sha256"] for kind, entry in artifacts.items()},
+    )
+
+
+def record_song(
+    catalog_path: Path,
+    output_dir: Path,
+    source: str,
+    genre: str,
+    lyrics: Lyrics,
+    phrases: list[str] | None = None,
+    video_url: str | None = None,
+    duration_seconds: float | None = None,
+    timings: dict[str, float] | None = None,
+    artifacts: dict[str, str] | None = None,
+) -> int:
+    """Insert or replace the catalog entry for a pipeline output folder; returns the song id.
+
+    artifacts maps a kind (e.g. "srt", "video") to a filename inside output_dir, as in
+    the manifest; each existing file is stored with its path and SHA-256.
+    """
+    output_dir = Path(output_dir).resolve()
+    music_path = output_dir / "music.mp3"
+    info_path = output_dir / "info.txt"
+    phrases = phrases or []
+
+    with connect(catalog_path) as conn:
+        conn.execute("DELETE FROM songs WHERE output_dir = ?", (str(output_dir),))
+        cursor = conn.execute(
+            """INSERT INTO songs (output_dir, source, genre, video_id, phrases, lyrics, lyrics_for_ai,
+                   music_path, music_sha256, info_path, info_sha256, duration_seconds, timings, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                str(output_dir),
+                source,
+                genre,
+                video_id_from_url(video_url) if video_url else None,
+                json.dumps(phrases, ensure_ascii=False),
+                lyrics.lyrics,
+                lyrics.lyrics_for_ai,
+                str(music_path) if music_path.exists() else None,
+                file_sha256(music_path) if music_path.exists() else None,
+                str(info_path) if info_path.exists() else None,
+                file_sha256(info_path) if info_path.exists() else None,
+                duration_seconds,
+                json.dumps(timings or {}),
+                time.time(),
+            ),
+        )
+        song_id = cursor.lastrowid
+        conn.executemany(
+            "INSERT OR IGNORE INTO song_words (word, song_id) VALUES (?, ?)",
+            [(normalize_word(phrase), song_id) for phrase in phrases if phrase.strip()],
+        )
+        artifact_paths = {kind: output_dir / filename for kind, filename in (artifacts or {}).items()}
+        conn.executemany(
+            "INSERT INTO song_artifacts (song_id, kind, path, sha256) VALUES (?, ?, ?, ?)",
+            [
+                (song_id, kind, str(path), file_sha256(path))
+                for kind, path in artifact_paths.items()
+                if path.is_file()
+            ],
+        )
+    print(f"Catalogued song {song_id} in {catalog_path}")
+    return song_id
+
+
+def find_existing(
+    catalog_path: Path,
+    source: str,
+    genre: str,
+    phrases: list[str] | None = None,
+    video_url: str | None = None,
+) -> Song | None:
+    """Find a finished song that already covers this request.
+
+    Video requests match on video ID and genre. Phrase requests match any song of the
+    same source and genre whose phrase set is identical to or a superset of the request.
+    """
+    if not catalog_path.exists():
+        return None
+
+    with connect(catalog_path) as conn:
+        if video_url:
+            video_id = video_id_from_url(video_url)
+            if not video_id:
+                return None
+            row = conn.execute(
+                f"""SELECT songs.*, {ARTIFACTS_SELECT} FROM songs WHERE source = ? AND genre = ? AND video_id = ?
+                   AND music_path IS NOT NULL ORDER BY created_at DESC LIMIT 1""",
+                (source, genre, video_id),
+            ).fetchone()
+        else:
+            words = sorted({normalize_word(phrase) for phrase in phrases or [] if phrase.strip()})
+            if not words:
+                return None
+            placeholders = ", ".join("?" * len(words))
+            row = conn.execute(
+                f"""SELECT songs.*, {ARTIFACTS_SELECT} FROM song_words JOIN songs ON songs.id = song_words.song_id
+                    WHERE song_words.word IN ({placeholders}) AND songs.source = ? AND songs.genre = ?
+                    AND songs.music_path IS NOT NULL
+                    GROUP BY songs.id HAVING COUNT(*) = ?
+                    ORDER BY json_array_length(songs.phrases), songs.created_at DESC LIMIT 1""",
+                (*words, source, genre, len(words)),
+            ).fetchone()
+
+    if row is None:
+        return None
+    song = _to_song(row)
+    if song.music_path is None or not song.music_path.exists():
+        return None
+    return song
+
+
+def songs_with_word(catalog_path: Path, word: str) -> list[Song]:
+    """Look up songs teaching a vocabulary word via the inverted index."""
+    if not catalog_path.exists():
+        return []
+    with connect(catalog_path) as conn:
+        rows = conn.execute(
+            f"""SELECT songs.*, {ARTIFACTS_SELECT} FROM song_words JOIN songs ON songs.id = song_words.song_id
+               WHERE song_words.word = ? ORDER BY songs.created_at DESC""",
+            (normalize_word(word),),
+        ).fetchall()
+    return [_to_song(row) for row in rows]
+
+
+def search_songs(catalog_path: Path, query: str = "", limit: int = 50, offset: int = 0) -> list[Song]:
+    """Browse songs newest first, optionally filtered by word prefix, lyrics, genre, video ID or folder."""
+    if not catalog_path.exists():
+        return []
+    with connect(catalog_path) as conn:
+        if not query.strip():
+            rows = conn.execute(
+                f"SELECT songs.*, {ARTIFACTS_SELECT} FROM songs ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+        else:
+            word = normalize_word(query)
+            pattern = f"%{query.strip()}%"
+            rows = conn.execute(
+                f"""SELECT songs.*, {ARTIFACTS_SELECT} FROM songs
+                   WHERE id IN (SELECT song_id FROM song_words WHERE word >= ? AND word < ?)
+                   OR lyrics LIKE ? OR lyrics_for_ai LIKE ? OR genre LIKE ? OR output_dir LIKE ? OR video_id = ?
+                   ORDER BY created_at DESC LIMIT ? OFFSET ?""",
+                (word, word + "\uffff", pattern, pattern, pattern, pattern, query.strip(), limit, offset),
+            ).fetchall()
+    return [_to_song(row) for row in rows]
@@ -1,7 +1,12 @@
+import json
+import re
 from pathlib import Path
 
 import openai
 
+from models import SECTION_PATTERN
+from util.model_cascade import run_cascade
+
 client = openai.OpenAI()
 
 
@@ -47,15 +52,74 @@ Please return a JSON array where each element contains:
 
 Match the original lyrics to the closest timestamps from the extracted transcript."""
 
-    alignment_completion = client.chat.completions.create(
-        model="gpt-5.2",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant that aligns lyrics with timestamps."},
-            {"role": "user", "content": alignment_prompt},
-        ],
-    )
+    def call(model: str) -> str:
+        alignment_completion = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant that aligns lyrics with timestamps."},
+                {"role": "user", "content": alignment_prompt},
+            ],
+        )
+        return alignment_completion.choices[0].message.content or ""
 
-    aligned_lyrics = alignment_completion.choices[0].message.content
+    aligned_lyrics = run_cascade(
+        "align_lyrics",
+        call,
+        lambda aligned: check_alignment(plain_lyrics, aligned),
+    )
     print("Aligned lyrics with timestamps:")
     print(aligned_lyrics)
     return aligned_lyrics
+
+
+def parse_alignment(aligned_lyrics: str) -> list[dict]:
+    """Parse the JSON array returned by align_lyrics, tolerating a ```json fence around it."""
+    text = aligned_lyrics.strip()
+    fence = re.match(r"^```(?:json)?\s*(.*?)\s*```$", text, re.DOTALL)
+    if fence:
+        text = fence.group(1)
+    lines = json.loads(text)
+    if not isinstance(lines, list):
+        raise ValueError("alignment is not a JSON array")
+    return lines
+
+
+def _normalize(text: str) -> str:
+    return "".join(text.split()).lower()
+
+
+def check_alignment(plain_lyrics: str, aligned_lyrics: str) -> list[str]:
+    """Check that an alignment is well-formed, monotonic and covers every lyric line."""
+    try:
+        lines = parse_alignment(aligned_lyrics)
+    except ValueError as exc:
+        return [f"alignment is not valid JSON: {exc}"]
+
+    problems = []
+    previous_start = float("-inf")
+    for index, line in enumerate(lines):
+        if not isinstance(line, dict) or not {"text", "start", "end"} <= line.keys():
+            problems.append(f"entry {index} is missing text/start/end")
+            continue
+        try:
+            start, end = float(line["start"]), float(line["end"])
+        except (TypeError, ValueError):
+            problems.append(f"entry {index} has non-numeric timestamps")
+            continue
+        if end < start:
+            problems.append(f"entry {index} ends before it starts ({start}-{end})")
+        if start < previous_start:
+            problems.append(f"entry {index} starts before the previous entry ({start} < {previous_start})")
+        previous_start = start
+    if problems:
+        return problems
+
+    aligned_text = _normalize("".join(str(line["text"]) for line in lines))
+    missing = [
+        line.strip()
+        for line in plain_lyrics.splitlines()
+        if line.strip() and not SECTION_PATTERN.match(line.strip()) and _normalize(line) not in aligned_text
+    ]
+    if missing:
+        problems.append(f"{len(missing)} lyric lines are not covered, e.g. {missing[0]!r}")
+    return problems
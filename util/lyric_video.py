@@ -0,0 +1,123 @@
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+from models import LyricLine, SongManifest
+from util.artifacts import ass_text, ass_time
+
+VIDEO_FILENAME = "lyrics_video.mp4"
+KARAOKE_ASS_FILENAME = "lyrics_karaoke.ass"
+WIDTH, HEIGHT = 1080, 1920
+FPS = 30
+BACKGROUND_COLOR = "0x101820"
+
+# Current line sweeps from white (Secondary) to gold (Primary) via \kf; the previous
+# and next lines are shown smaller and dimmed above and below it.
+KARAOKE_ASS_HEADER = f"""[Script Info]
+ScriptType: v4.00+
+PlayResX: {WIDTH}
+PlayResY: {HEIGHT}
+WrapStyle: 0
+ScaledBorderAndShadow: yes
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Current,Noto Sans CJK JP,84,&H0000D7FF,&H00FFFFFF,&H00000000,&H80000000,-1,0,0,0,100,100,0,0,1,5,2,5,60,60,0,1
+Style: Context,Noto Sans CJK JP,60,&H00A0A0A0,&H00A0A0A0,&H00000000,&H80000000,0,0,0,0,100,100,0,0,1,3,0,5,60,60,0,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+LINE_SPACING = 200
+TAIL_SECONDS = 1.0
+
+
+def _karaoke_text(line: LyricLine) -> str:
+    """Split the line's duration across its words by length as \\kf sweeps."""
+    words = line.text.split()
+    total_cs = max(round((line.end - line.start) * 100), len(words))
+    total_chars = sum(len(word) for word in words)
+    parts = []
+    elapsed = 0
+    for index, word in enumerate(words):
+        if index == len(words) - 1:
+            duration = max(total_cs - elapsed, 0)
+        else:
+            duration = round(total_cs * len(word) / total_chars)
+        elapsed += duration
+        parts.append(f"{{\\kf{duration}}}{ass_text(word)}")
+    return " ".join(parts)
+
+
+def karaoke_ass(lines: list[LyricLine]) -> str:
+    """Build an ASS script that shows each line with its neighbours and highlights it as it is sung."""
+    center_x, center_y = WIDTH // 2, HEIGHT // 2
+    events = []
+    for index, line in enumerate(lines):
+        # Each line hands over to the next at the next line's start, even when the aligned
+        # timings overlap, so only one Current line is ever drawn at the centre.
+        shown_until = lines[index + 1].start if index + 1 < len(lines) else line.end + TAIL_SECONDS
+        if shown_until <= line.start:
+            continue
+        sung = line.model_copy(update={"end": min(line.end, shown_until)})
+        start, end = ass_time(line.start), ass_time(shown_until)
+        events.append(
+            f"Dialogue: 1,{start},{end},Current,,0,0,0,,{{\\pos({center_x},{center_y})}}{_karaoke_text(sung)}"
+        )
+        if index > 0:
+            events.append(
+                f"Dialogue: 0,{start},{end},Context,,0,0,0,,"
+                f"{{\\pos({center_x},{center_y - LINE_SPACING})}}{ass_text(lines[index - 1].text)}"
+            )
+        if index + 1 < len(lines):
+            events.append(
+                f"Dialogue: 0,{start},{end},Context,,0,0,0,,"
+                f"{{\\pos({center_x},{center_y + LINE_SPACING})}}{ass_text(lines[index + 1].text)}"
+            )
+    return KARAOKE_ASS_HEADER + "\n".join(events) + "\n"
+
+
+def render_lyric_video(manifest: SongManifest, output_dir: Path) -> Path | None:
+    """Render a vertical karaoke-style lyric video from music.mp3 and the manifest's timed lines.
+
+    libass draws the lyrics directly inside ffmpeg over a solid background, so no frames
+    are written to disk, and x264 encodes on all cores. Returns None when ffmpeg is not
+    installed, the render fails, or there are no timed lines.
+    """
+    if shutil.which("ffmpeg") is None:
+        print("ffmpeg not found, skipping lyric video render")
+        return None
+    if not manifest.lines:
+        print("No timed lyric lines, skipping lyric video render")
+        return None
+
+    (output_dir / KARAOKE_ASS_FILENAME).write_text(karaoke_ass(manifest.lines), encoding="utf-8")
+
+    start = time.time()
+    # Run inside output_dir so the ass filter gets a plain relative filename with nothing to escape.
+    try:
+        subprocess.run(
+            [
+                "ffmpeg", "-y", "-loglevel", "error",
+                "-f", "lavfi", "-i", f"color=c={BACKGROUND_COLOR}:s={WIDTH}x{HEIGHT}:r={FPS}",
+                "-i", "music.mp3",
+                "-vf", f"ass={KARAOKE_ASS_FILENAME}",
+                "-shortest",
+                "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", "-threads", "0",
+                "-c:a", "aac", "-b:a", "192k",
+                "-movflags", "+faststart",
+                VIDEO_FILENAME,
+            ],
+            cwd=output_dir,
+            check=True,
+        )
+    except subprocess.CalledProcessError as exc:
+        print(f"Lyric video render failed (ffmpeg exited with {exc.returncode}), skipping lyric video")
+        return None
+    elapsed = time.time() - start
+
+    video_path = output_dir / VIDEO_FILENAME
+    speed = f", {manifest.duration_seconds / elapsed:.1f}x realtime" if manifest.duration_seconds else ""
+    print(f"Lyric video saved to: {video_path} (rendered in {elapsed:.1f}s{speed})")
+    return video_path
@@ -0,0 +1,188 @@
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Generator, Iterator, TypeVar
+
+import openai
+import pydantic
+
+T = TypeVar("T")
+
+# Cheapest/fastest model first; later tiers are only used when the previous
+# tier's output fails local validation. Override with a comma-separated
+# MODEL_CASCADE env var, e.g. MODEL_CASCADE="gpt-5-nano,gpt-5-mini,gpt-5.2".
+DEFAULT_MODEL_CASCADE = ["gpt-5-mini", "gpt-5.2"]
+
+# Errors from a cheap tier that should escalate instead of failing the call.
+ESCALATE_ERRORS = (
+    openai.LengthFinishReasonError,
+    openai.ContentFilterFinishReasonError,
+    pydantic.ValidationError,
+)
+
+# Per cascade name and model: calls, seconds spent in those calls, accepted hits,
+# outputs rejected by validation and errors that escalated.
+tier_stats: dict[str, dict[str, Counter]] = defaultdict(lambda: defaultdict(Counter))
+# Per cascade name: requests, end-to-end seconds and requests that escalated past the first tier.
+cascade_stats: dict[str, Counter] = defaultdict(Counter)
+
+
+def get_model_cascade() -> list[str]:
+    """Return the configured model cascade, cheapest first."""
+    configured = os.getenv("MODEL_CASCADE", "")
+    models = [model.strip() for model in configured.split(",") if model.strip()]
+    return models or list(DEFAULT_MODEL_CASCADE)
+
+
+def run_cascade(
+    name: str,
+    call: Callable[[str], T],
+    validate: Callable[[T], list[str]],
+    models: list[str] | None = None,
+) -> T:
+    """Call each model in turn and return the first output that passes validation.
+
+    `call(model)` performs the request with the given model and `validate(result)`
+    returns a list of problems (empty when the output is acceptable). The last
+    tier's output is returned even if it still has problems, matching the
+    behaviour before the cascade existed.
+    """
+    models = models or get_model_cascade()
+    cascade_start = time.time()
+    for tier, model in enumerate(models):
+        is_last = tier == len(models) - 1
+        call_start = time.time()
+        try:
+            result = call(model)
+        except ESCALATE_ERRORS as exc:
+            _record_error(name, model, exc, is_last, call_start)
+            if is_last:
+                raise
+            continue
+
+        if _accept(name, model, tier, validate(result), is_last, call_start, cascade_start):
+            return result
+
+    raise RuntimeError(f"[{name}] model cascade is empty")
+
+
+def stream_cascade(
+    name: str,
+    stream_call: Callable[[str], Generator[T, None, T]],
+    validate: Callable[[T], list[str]],
+    models: list[str] | None = None,
+) -> Iterator[T]:
+    """Streaming counterpart of run_cascade.
+
+    `stream_call(model)` is a generator that yields partial results as they arrive
+    and returns the final result. Partials from every tier tried are yielded, and
+    the accepted final result is always the last value yielded.
+    """
+    models = models or get_model_cascade()
+    cascade_start = time.time()
+    for tier, model in enumerate(models):
+        is_last = tier == len(models) - 1
+        call_start = time.time()
+        try:
+            result = yield from stream_call(model)
+        except ESCALATE_ERRORS as exc:
+            _record_error(name, model, exc, is_last, call_start)
+            if is_last:
+                raise
+            continue
+
+        if _accept(name, model, tier, validate(result), is_last, call_start, cascade_start):
+            yield result
+            return
+
+    raise RuntimeError(f"[{name}] model cascade is empty")
+
+
+def _record_error(name: str, model: str, exc: Exception, is_last: bool, call_start: float) -> None:
+    stats = tier_stats[name][model]
+    stats["calls"] += 1
+    stats["seconds"] += time.time() - call_start
+    stats["errors"] += 1
+    if not is_last:
+        print(f"[{name}] {model} failed ({type(exc).__name__}), escalating")
+
+
+def _accept(
+    name: str,
+    model: str,
+    tier: int,
+    problems: list[str],
+    is_last: bool,
+    call_start: float,
+    cascade_start: float,
+) -> bool:
+    """Record one tier call and decide whether its output is accepted."""
+    stats = tier_stats[name][model]
+    stats["calls"] += 1
+    stats["seconds"] += time.time() - call_start
+
+    if problems and not is_last:
+        stats["rejected"] += 1
+        print(f"[{name}] {model} output rejected, escalating: {'; '.join(problems)}")
+        return False
+    if problems:
+        print(f"[{name}] {model} output still has problems: {'; '.join(problems)}")
+
+    stats["hits"] += 1
+    totals = cascade_stats[name]
+    totals["requests"] += 1
+    totals["seconds"] += time.time() - cascade_start
+    totals["escalated"] += tier > 0
+    print(
+        f"[{name}] accepted {model} in {time.time() - cascade_start:.1f}s "
+        f"(model call {time.time() - call_start:.1f}s; {format_hit_rates(name)})"
+    )
+    return True
+
+
+def format_hit_rates(name: str) -> str:
+    """Format per-tier hit rates and mean call latency for one cascade.
+
+    e.g. "gpt-5-mini 3/4 hits (75%), 1 rejected, 4.1s/call; gpt-5.2 1/4 hits (25%), 9.8s/call; 1/4 escalated"
+    """
+    totals = cascade_stats[name]
+    requests = totals["requests"]
+    parts = []
+    for model, stats in tier_stats[name].items():
+        part = f"{model} {stats['hits']}/{requests} hits ({stats['hits'] / max(requests, 1):.0%})"
+        if stats["rejected"]:
+            part += f", {stats['rejected']} rejected"
+        if stats["errors"]:
+            part += f", {stats['errors']} errors"
+        part += f", {stats['seconds'] / max(stats['calls'], 1):.1f}s/call"
+        parts.append(part)
+    parts.append(f"{totals['escalated']}/{requests} escalated")
+    return "; ".join(parts)
+
+
+def cascade_report() -> dict[str, dict]:
+    """Return per-tier hits, hit rate, rejections, errors and mean call latency, plus escalation totals.
+
+    {name: {"requests", "escalated", "escalation_rate", "mean_seconds", "tiers": {model: {...}}}}
+    """
+    report = {}
+    for name, totals in cascade_stats.items():
+        requests = totals["requests"]
+        report[name] = {
+            "requests": requests,
+            "escalated": totals["escalated"],
+            "escalation_rate": totals["escalated"] / requests,
+            "mean_seconds": totals["seconds"] / requests,
+            "tiers": {
+                model: {
+                    "calls": stats["calls"],
+                    "hits": stats["hits"],
+                    "hit_rate": stats["hits"] / requests,
+                    "rejected": stats["rejected"],
+                    "errors": stats["errors"],
+                    "mean_call_seconds": stats["seconds"] / max(stats["calls"], 1),
+                }
+                for model, stats in tier_stats[name].items()
+            },
+        }
+    return report
@@ -0,0 +1,141 @@
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from models import LyricLine
+
+SAMPLE_RATE = 16000
+HOP = 160  # 10 ms
+FRAME = 512
+VOCAL_BAND_HZ = (300, 3400)
+TOLERANCE_SECONDS = 0.35
+BLOCK_FRAMES = 4096
+MIN_LINE_SECONDS = 0.2
+
+
+def decode_pcm(music_path: Path, pcm_path: Path) -> np.ndarray:
+    """Decode audio once to mono 16 kHz int16 PCM on disk and memory-map it."""
+    subprocess.run(
+        [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-i", str(music_path),
+            "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+            str(pcm_path),
+        ],
+        check=True,
+    )
+    if pcm_path.stat().st_size == 0:
+        return np.zeros(0, dtype=np.int16)
+    return np.memmap(pcm_path, dtype=np.int16, mode="r")
+
+
+def vocal_band_envelope(samples: np.ndarray) -> np.ndarray:
+    """Log energy in the vocal band per 10 ms hop, lightly smoothed."""
+    if len(samples) < FRAME:
+        return np.zeros(0)
+    frames = np.lib.stride_tricks.sliding_window_view(samples, FRAME)[::HOP]
+    window = np.hanning(FRAME).astype(np.float32)
+    freqs = np.fft.rfftfreq(FRAME, 1 / SAMPLE_RATE)
+    band = (freqs >= VOCAL_BAND_HZ[0]) & (freqs <= VOCAL_BAND_HZ[1])
+
+    # Blocks of frames keep the FFT working set small while the PCM is paged in from the memmap.
+    energy = np.empty(len(frames))
+    for block in range(0, len(frames), BLOCK_FRAMES):
+        spectrum = np.abs(np.fft.rfft(frames[block:block + BLOCK_FRAMES] * window, axis=1)) ** 2
+        energy[block:block + BLOCK_FRAMES] = spectrum[:, band].sum(axis=1)
+    log_energy = np.log10(energy + 1e-6)
+    if len(log_energy) < 5:
+        # mode="same" returns the longer of the two inputs, so don't smooth fewer frames than the kernel.
+        return log_energy
+    return np.convolve(log_energy, np.ones(5) / 5, mode="same")
+
+
+def _peaks(curve: np.ndarray) -> np.ndarray:
+    """Times (seconds) of local maxima of curve that stand out above its mean + std."""
+    if len(curve) < 3:
+        return np.zeros(0)
+    threshold = curve.mean() + curve.std()
+    is_peak = (curve[1:-1] > curve[:-2]) & (curve[1:-1] >= curve[2:]) & (curve[1:-1] > threshold)
+    return (np.flatnonzero(is_peak) + 1) * HOP / SAMPLE_RATE
+
+
+def onsets_and_offsets(envelope: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Vocal onsets are sharp rises in the envelope, offsets are sharp drops."""
+    flux = np.diff(envelope, prepend=envelope[:1])
+    return _peaks(np.maximum(flux, 0)), _peaks(np.maximum(-flux, 0))
+
+
+def _snap(value: float, candidates: np.ndarray, tolerance: float) -> float:
+    if len(candidates) == 0:
+        return value
+    index = np.searchsorted(candidates, value)
+    nearby = candidates[max(index - 1, 0):index + 1]
+    nearest = nearby[np.argmin(np.abs(nearby - value))]
+    return float(nearest) if abs(nearest - value) <= tolerance else value
+
+
+def snap_lines(
+    lines: list[LyricLine],
+    onsets: np.ndarray,
+    offsets: np.ndarray,
+    tolerance: float = TOLERANCE_SECONDS,
+) -> list[LyricLine]:
+    """Snap each line's start to the nearest onset and its end to the nearest offset within tolerance.
+
+    A start snap is dropped if it would land before the previous refined line's start or
+    end, and an end snap if it would run past the next line's start. Both are dropped if
+    the line would become shorter than MIN_LINE_SECONDS. The result is then clamped to
+    start no earlier than the previous line's end and end no later than the next line's
+    start, so lines never overlap even when the aligned times already did.
+    """
+    refined = []
+    previous_start = previous_end = float("-inf")
+    for index, line in enumerate(lines):
+        next_start = lines[index + 1].start if index + 1 < len(lines) else float("inf")
+        start = _snap(line.start, onsets, tolerance)
+        end = _snap(line.end, offsets, tolerance)
+        if start < max(previous_start, previous_end):
+            start = line.start
+        if end > next_start:
+            end = line.end
+        if end - start < MIN_LINE_SECONDS:
+            start, end = line.start, line.end
+        start = max(start, previous_end)
+        end = max(min(end, next_start), start)
+        refined.append(line.model_copy(update={"start": round(start, 3), "end": round(end, 3)}))
+        previous_start, previous_end = refined[-1].start, refined[-1].end
+    return refined
+
+
+def refine_line_boundaries(
+    lines: list[LyricLine], music_path: Path, tolerance: float = TOLERANCE_SECONDS
+) -> list[LyricLine]:
+    """Refine Whisper-derived line boundaries against vocal onsets/offsets decoded from the track.
+
+    Returns the lines unchanged when ffmpeg is not installed, decoding fails, or there is nothing to refine.
+    """
+    if not lines:
+        return lines
+    if shutil.which("ffmpeg") is None:
+        print("ffmpeg not found, skipping timestamp refinement")
+        return lines
+
+    start = time.time()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        try:
+            samples = decode_pcm(music_path, Path(temp_dir) / "music.pcm")
+        except subprocess.CalledProcessError as exc:
+            print(f"Decoding {music_path} failed (ffmpeg exited with {exc.returncode}), skipping timestamp refinement")
+            return lines
+        envelope = vocal_band_envelope(samples)
+        del samples
+    onsets, offsets = onsets_and_offsets(envelope)
+    refined = snap_lines(lines, onsets, offsets, tolerance)
+
+    moved = sum(1 for old, new in zip(lines, refined) if (old.start, old.end) != (new.start, new.end))
+    print(f"Refined {moved}/{len(lines)} line boundaries in {time.time() - start:.2f}s")
+    return refined
@@ -0,0 +1,61 @@
+import subprocess
+import time
+from pathlib import Path
+from typing import Iterator
+
+SEGMENT_SECONDS = 60
+POLL_INTERVAL = 0.5
+
+# Smallest audio-only stream; fall back to the smallest format with audio if there is none.
+YT_DLP_FORMAT = "worstaudio/worst"
+
+
+def iter_audio_segments(video_url: str, segment_dir: Path) -> Iterator[Path]:
+    """Stream a video's audio through ffmpeg into fixed-length segments, yielding each as it completes.
+
+    yt-dlp writes the smallest audio-only format to stdout with no post-processing, and
+    ffmpeg cuts it into SEGMENT_SECONDS-long 16 kHz mono Opus files as bytes arrive, so
+    early segments can be consumed while later ones are still downloading. A segment is
+    complete once ffmpeg has started the next one, or once ffmpeg has exited.
+    """
+    download = subprocess.Popen(
+        ["yt-dlp", "--quiet", "--no-part", "-f", YT_DLP_FORMAT, "-o", "-", video_url],
+        stdout=subprocess.PIPE,
+    )
+    segmenter = subprocess.Popen(
+        [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-vn", "-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "24k",
+            "-f", "segment", "-segment_time", str(SEGMENT_SECONDS), "-segment_format", "ogg",
+            str(segment_dir / "segment_%04d.ogg"),
+        ],
+        stdin=download.stdout,
+    )
+    # Only ffmpeg should hold the read end, so yt-dlp sees a broken pipe if ffmpeg dies.
+    download.stdout.close()
+
+    yielded = 0
+    try:
+        while True:
+            finished = segmenter.poll() is not None
+            segments = sorted(segment_dir.glob("segment_*.ogg"))
+            complete = segments if finished else segments[:-1]
+            for segment in complete[yielded:]:
+                yield segment
+            yielded = max(yielded, len(complete))
+            if finished:
+                break
+            time.sleep(POLL_INTERVAL)
+    finally:
+        if segmenter.poll() is None:
+            segmenter.kill()
+        if download.poll() is None:
+            download.kill()
+        segmenter.wait()
+        download.wait()
+
+    if download.returncode != 0:
+        raise subprocess.CalledProcessError(download.returncode, "yt-dlp")
+    if segmenter.returncode != 0:
+        raise subprocess.CalledProcessError(segmenter.returncode, "ffmpeg")